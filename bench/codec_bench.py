@@ -0,0 +1,103 @@
+"""
+Бенчмарк JSON-кодека: stdlib json против orjson (FAST_JSON=1).
+
+Замеряет на записанных апдейтах (bench/updates.jsonl):
+- decode: bytes тела вебхука -> types.Update (как codec.WebhookHandler);
+- encode: сериализация полей исходящих запросов (reply_markup и т.п.),
+  как это делает aiogram через aiogram.utils.json.dumps.
+
+Запуск из корня репозитория:
+    python bench/codec_bench.py [--rounds 2000]
+"""
+
+import sys
+import timeit
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aiogram import types  # noqa: E402
+
+import codec  # noqa: E402
+
+UPDATES_FILE = Path(__file__).with_name("updates.jsonl")
+
+def load_payloads():
+    return [line.encode() for line in UPDATES_FILE.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+def outbound_fields():
+    """Типичные JSON-поля исходящих запросов бота (клавиатуры из main.py)."""
+    reply_kb = types.ReplyKeyboardMarkup(
+        keyboard=[
+            [types.KeyboardButton("Срочно 24 часа")],
+            [types.KeyboardButton("В течении 3-5 дней")],
+            [types.KeyboardButton("Стандартно 7 дней")],
+            [types.KeyboardButton("Отмена заявки")],
+        ],
+        resize_keyboard=True,
+    )
+    confirm_kb = types.InlineKeyboardMarkup().row(
+        types.InlineKeyboardButton("✅ Подтвердить", callback_data="confirm_yes"),
+        types.InlineKeyboardButton("❌ Отменить", callback_data="confirm_no"),
+    )
+    media = [
+        {"type": "photo", "media": "AgACAgIAAxkBAAIBx", "caption": "Заявка №42: фото"},
+        {"type": "document", "media": "BQACAgIAAxkBAAIBdoc", "caption": "Заявка №42: документ"},
+    ]
+    return [reply_kb.to_python(), confirm_kb.to_python(), media]
+
+def bench(mode_enabled: bool, payloads, fields, rounds: int) -> dict:
+    mode = codec.install(mode_enabled)
+    loads, dumps = codec.loads, codec.dumps
+
+    def decode():
+        for raw in payloads:
+            types.Update(**loads(raw))
+
+    def decode_only():
+        for raw in payloads:
+            loads(raw)
+
+    def encode():
+        for obj in fields:
+            dumps(obj)
+
+    res = {"mode": mode}
+    for name, fn, n_items in (
+        ("decode+Update", decode, len(payloads)),
+        ("decode", decode_only, len(payloads)),
+        ("encode", encode, len(fields)),
+    ):
+        best = min(timeit.repeat(fn, number=rounds, repeat=3))
+        res[name] = best / (rounds * n_items) * 1e6  # мкс на объект
+    return res
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = load_payloads()
+    fields = outbound_fields()
+    print(f"payloads: {len(payloads)} апдейтов, {sum(map(len, payloads))} байт; rounds={args.rounds}")
+
+    results = [bench(False, payloads, fields, args.rounds)]
+    if codec.orjson is not None:
+        results.append(bench(True, payloads, fields, args.rounds))
+    else:
+        print("orjson не установлен — сравнивать не с чем (pip install orjson)")
+
+    cols = ("decode+Update", "decode", "encode")
+    print(f"{'mode':<10}" + "".join(f"{c + ', мкс':>20}" for c in cols))
+    for r in results:
+        print(f"{r['mode']:<10}" + "".join(f"{r[c]:>20.2f}" for c in cols))
+    if len(results) == 2:
+        base, fast = results
+        print(f"{'speedup':<10}" + "".join(f"{base[c] / fast[c]:>19.2f}x" for c in cols))
+
+    codec.install(False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+VoltHomeBot — JSON-кодек для вебхука и запросов к Bot API.
+
+FAST_JSON=1 подключает orjson:
+- к разбору тела webhook-POST в types.Update;
+- к aiogram.utils.json, через который aiogram кодирует поля запросов
+  (reply_markup, media, ...) и разбирает ответы Bot API (в т.ч. getUpdates).
+Если orjson не установлен — остаётся stdlib json.
+
+Сырые байты входящего webhook-апдейта сохраняются в request["raw_update"] —
+это точка подключения будущего журнала запросов (aiohttp-middleware вокруг
+вебхука), чтобы он не кодировал апдейт повторно.
+"""
+
+import json as _stdlib_json
+from typing import Any, Union
+
+from aiogram import types
+from aiogram.dispatcher.webhook import WebhookRequestHandler
+
+try:
+    import orjson
+except ImportError:  # опциональная зависимость
+    orjson = None
+
+# -------------------- CODEC --------------------
+def _std_loads(data: Union[bytes, str]) -> Any:
+    return _stdlib_json.loads(data)
+
+def _std_dumps(obj: Any) -> str:
+    return _stdlib_json.dumps(obj, ensure_ascii=False)
+
+def _fast_loads(data: Union[bytes, str]) -> Any:
+    return orjson.loads(data)
+
+def _fast_dumps(obj: Any) -> str:
+    # orjson отдаёт UTF-8 bytes без \\u-экранирования — как ensure_ascii=False
+    return orjson.dumps(obj).decode()
+
+loads = _std_loads
+dumps = _std_dumps
+mode = "json"
+
+def install(enabled: bool) -> str:
+    """Выбирает кодек и подменяет им aiogram.utils.json. Возвращает имя режима.
+
+    Вызывается при импорте main.py, до настройки логирования, поэтому сам ничего
+    не логирует: откат на stdlib при enabled=True видно по возвращённому "json".
+    """
+    global loads, dumps, mode
+    if enabled and orjson is not None:
+        loads, dumps, mode = _fast_loads, _fast_dumps, "orjson"
+    else:
+        loads, dumps, mode = _std_loads, _std_dumps, "json"
+
+    # Модули aiogram обращаются к json.dumps/json.loads через атрибуты модуля,
+    # поэтому подмены функций достаточно (сессии создаются позже, лениво).
+    from aiogram.utils import json as aiogram_json
+    aiogram_json.loads = loads
+    aiogram_json.dumps = dumps
+    return mode
+
+# -------------------- WEBHOOK --------------------
+class WebhookHandler(WebhookRequestHandler):
+    """Webhook-хендлер: разбирает тело выбранным кодеком и сохраняет сырые байты."""
+
+    async def parse_update(self, bot):
+        raw = await self.request.read()
+        self.request["raw_update"] = raw
+        return types.Update(**loads(raw))
@@ -0,0 +1,371 @@
+"""
+Нагрузочный драйвер VoltHomeBot: фейковый Bot API + тысячи симулированных клиентов.
+
+Драйвер поднимает loadtest/fake_api.py, запускает main.py отдельным процессом
+(TELEGRAM_API_URL указывает на фейк) в режиме webhook или polling и прогоняет
+через бота полные сценарии Form (все четыре услуги, от /start до подтверждения).
+Каждый клиент отправляет следующий шаг только после ответа бота, как человек.
+
+Латентность шага — от подачи апдейта до первого сообщения бота в чат клиента.
+Ответ сверяется с ожидаемым началом текста, подтверждённая заявка — с
+сообщением проектировщику; любое расхождение проваливает сценарий.
+Отчёт: пропускная способность, перцентили латентности по шагам, ошибки.
+
+Запуск из корня репозитория:
+    python loadtest/driver.py --mode webhook --users 2000 --concurrency 500
+    python loadtest/driver.py --mode polling --users 2000 --latency-ms 40 --rate-limit-rate 0.01
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from aiogram.utils import json
+
+from fake_api import BOT_USER, FakeTelegram, add_fault_args, faults_from_args
+
+ROOT = Path(__file__).resolve().parent.parent
+DESIGNER_CHAT_ID = 777
+FIRST_CHAT_ID = 10_000_000
+
+# -------------------- СЦЕНАРИИ --------------------
+# Шаг: (вид, значение, начало ожидаемого ответа бота)
+# вид: "text" | "callback" | "photo" | "document" (значение для вложений — None)
+CONFIRMED = "✅ Ваша заявка принята"
+CANCELLED = "❌ Заявка отменена."
+JOURNEYS = {
+    "draft": [
+        ("text", "/start", "🔌 Добро пожаловать"),
+        ("text", "1⃣ Чертёж схемы (от 2490 ₽)", "Уточните тип чертежа:"),
+        ("text", "Однолинейная схема", "Выберите тип объекта:"),
+        ("text", "Жилое", "Укажите площадь объекта"),
+        ("text", "85", "Есть ли перечень групп"),
+        ("callback", "groups_yes", "Прикрепите фото/план/ТЗ"),
+        ("photo", None, "Добавлено вложений: 1"),
+        ("text", "Готово", "⏱️ Выберите срочность"),
+        ("text", "Срочно 24 часа", "📐 *Предварительный расчёт (чертёж)"),
+        ("callback", "confirm_yes", CONFIRMED),
+    ],
+    "loads": [
+        ("text", "/start", "🔌 Добро пожаловать"),
+        ("text", "2⃣ Консультация по нагрузкам (от 1990 ₽)", "Какой тип консультации по нагрузкам?"),
+        ("text", "Подбор автоматов/УЗО", "Выберите тип объекта:"),
+        ("text", "Коммерческое", "Укажите площадь"),
+        ("text", "120", "Сколько электрических групп"),
+        ("text", "14", "Учитывать пусковые токи?"),
+        ("callback", "inrush_no", "Прикрепите"),
+        ("document", None, "Добавлено вложений: 1"),
+        ("text", "Готово", "⏱️ Выберите срочность"),
+        ("text", "Стандартно 7 дней", "🔌 *Предварительный расчёт (нагрузки)"),
+        ("callback", "confirm_yes", CONFIRMED),
+    ],
+    "full": [
+        ("text", "/start", "🔌 Добро пожаловать"),
+        ("text", "3⃣ Полная консультация (от 4990 ₽)", "Выберите тип объекта:"),
+        ("text", "Жилое", "Укажите площадь"),
+        ("text", "60", "Сколько помещений"),
+        ("text", "4", "Нужна ли монтажная схема?"),
+        ("callback", "needmount_yes", "Прикрепите"),
+        ("text", "Готово", "⏱️ Выберите срочность"),
+        ("text", "В течении 3-5 дней", "🧩 *Предварительный расчёт (полная"),
+        ("callback", "confirm_yes", CONFIRMED),
+    ],
+    "other": [
+        ("text", "/start", "🔌 Добро пожаловать"),
+        ("text", "4⃣ Другое", "Опишите кратко"),
+        ("text", "Нужен расчёт сечения кабеля для мастерской", "Прикрепите"),
+        ("text", "Готово", "⏱️ Выберите срочность"),
+        ("text", "Стандартно 7 дней", "📝 *Предварительная оценка"),
+        ("callback", "confirm_no", CANCELLED),
+    ],
+}
+
+# Заявка проектировщику: по этой строке драйвер узнаёт, чья она
+DESIGNER_CLIENT_ID = re.compile(r"Telegram ID клиента: (\d+)")
+
+def _step_name(kind: str, value: Optional[str]) -> str:
+    if kind == "text":
+        return value if len(value) <= 24 else value[:23] + "…"
+    if kind == "callback":
+        return f"cb:{value}"
+    return kind
+
+class SimUser:
+    """Клиент бота: собирает апдейты своих шагов."""
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.user = {"id": chat_id, "is_bot": False, "first_name": "Load", "language_code": "ru"}
+        self.chat = {"id": chat_id, "type": "private", "first_name": "Load"}
+        self.message_id = 0
+        self.last_bot_message: Optional[dict] = None
+
+    def _message(self, **content) -> dict:
+        self.message_id += 1
+        msg = {"message_id": self.message_id, "from": self.user, "chat": self.chat, "date": int(time.time())}
+        msg.update(content)
+        return msg
+
+    def update_for(self, kind: str, value: Optional[str]) -> dict:
+        if kind == "text":
+            extra = {}
+            if value.startswith("/"):
+                extra["entities"] = [{"offset": 0, "length": len(value), "type": "bot_command"}]
+            return {"message": self._message(text=value, **extra)}
+        if kind == "photo":
+            fid = f"AgACAgIAAx-{self.chat_id}-{self.message_id}"
+            return {"message": self._message(photo=[
+                {"file_id": fid, "file_unique_id": fid, "width": 1280, "height": 960, "file_size": 95113},
+            ])}
+        if kind == "document":
+            fid = f"BQACAgIAAx-{self.chat_id}-{self.message_id}"
+            return {"message": self._message(document={
+                "file_id": fid, "file_unique_id": fid, "file_name": "plan.pdf", "mime_type": "application/pdf",
+            })}
+        # callback — нажатие кнопки под последним сообщением бота
+        self.message_id += 1
+        return {"callback_query": {
+            "id": f"{self.chat_id}{self.message_id}",
+            "from": self.user,
+            "chat_instance": str(self.chat_id),
+            "data": value,
+            "message": self.last_bot_message or {
+                "message_id": self.message_id, "from": BOT_USER, "chat": self.chat, "date": int(time.time()),
+            },
+        }}
+
+# -------------------- СТАТИСТИКА --------------------
+class Stats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.step_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.step_timeouts: Counter = Counter()
+        self.step_mismatches: Counter = Counter()
+        # Telegram ID клиентов из заявок, пришедших проектировщику
+        self.designer_clients: set = set()
+        self.journeys: Counter = Counter()
+        self.journeys_failed: Counter = Counter()
+        self.updates_sent = 0
+        self.started = 0.0
+        self.finished = 0.0
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return values[idx]
+
+def _lat_row(name: str, values: List[float], timeouts: int = 0, mismatches: int = 0) -> str:
+    ms = [v * 1000 for v in values]
+    return (
+        f"{name:<26}{len(ms):>8}{timeouts:>9}{mismatches:>10}"
+        f"{_pct(ms, 0.50):>9.1f}{_pct(ms, 0.90):>9.1f}{_pct(ms, 0.95):>9.1f}"
+        f"{_pct(ms, 0.99):>9.1f}{(max(ms) if ms else float('nan')):>9.1f}"
+    )
+
+def build_report(args, stats: Stats, fake: FakeTelegram) -> dict:
+    elapsed = stats.finished - stats.started
+    done = sum(stats.journeys.values())
+    failed = sum(stats.journeys_failed.values())
+    return {
+        "mode": args.mode,
+        "fast_json": args.fast_json,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "faults": {
+            "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "journeys_ok": done - failed,
+        "journeys_failed": failed,
+        "journeys_per_s": round((done - failed) / elapsed, 2) if elapsed else 0.0,
+        "updates_sent": stats.updates_sent,
+        "updates_per_s": round(stats.updates_sent / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            q: round(_pct(stats.latencies, v) * 1000, 2)
+            for q, v in (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+        },
+        "step_timeouts": sum(stats.step_timeouts.values()),
+        "step_mismatches": sum(stats.step_mismatches.values()),
+        "api_calls": dict(fake.calls),
+        "faults_injected": {str(k): v for k, v in fake.faults_injected.items()},
+        "webhook_failures": fake.webhook_failures,
+        "unwatched_messages": sum(fake.unwatched_messages.values()),
+    }
+
+def print_report(report: dict, stats: Stats) -> None:
+    print()
+    print(f"=== VoltHomeBot load test: {report['mode']} (fast_json={report['fast_json']}) ===")
+    print(f"users={report['users']} concurrency={report['concurrency']} faults={report['faults']}")
+    print(f"elapsed: {report['elapsed_s']} s")
+    print(f"journeys: ok={report['journeys_ok']} failed={report['journeys_failed']} "
+          f"({report['journeys_per_s']}/s)")
+    print(f"updates: {report['updates_sent']} ({report['updates_per_s']}/s)")
+    print()
+    print(f"{'step':<26}{'n':>8}{'timeout':>9}{'mismatch':>10}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    print(_lat_row("ALL", stats.latencies, sum(stats.step_timeouts.values()), sum(stats.step_mismatches.values())))
+    for name in sorted(stats.step_latencies):
+        print(_lat_row(name, stats.step_latencies[name], stats.step_timeouts[name], stats.step_mismatches[name]))
+    print()
+    print("API calls: " + ", ".join(f"{k}={v}" for k, v in sorted(report["api_calls"].items())))
+    print(f"faults injected: {report['faults_injected']}  webhook failures: {report['webhook_failures']}  "
+          f"messages to unwatched chats: {report['unwatched_messages']}")
+
+# -------------------- ДРАЙВЕР --------------------
+async def run_user(fake: FakeTelegram, user: SimUser, journey: str, stats: Stats, step_timeout: float) -> None:
+    inbox = fake.watch(user.chat_id)
+    try:
+        await _run_steps(fake, inbox, user, journey, stats, step_timeout)
+    finally:
+        fake.unwatch(user.chat_id)
+
+async def _run_steps(fake: FakeTelegram, inbox: asyncio.Queue, user: SimUser, journey: str,
+                     stats: Stats, step_timeout: float) -> None:
+    stats.journeys[journey] += 1
+    for kind, value, expected in JOURNEYS[journey]:
+        name = _step_name(kind, value)
+        # Хвосты предыдущего шага не должны засчитываться как ответ на этот
+        while not inbox.empty():
+            inbox.get_nowait()
+
+        sent = time.perf_counter()
+        await fake.inject(user.update_for(kind, value))
+        stats.updates_sent += 1
+        try:
+            received, msg = await asyncio.wait_for(inbox.get(), step_timeout)
+        except asyncio.TimeoutError:
+            stats.step_timeouts[name] += 1
+            stats.journeys_failed[journey] += 1
+            return
+        user.last_bot_message = msg
+        stats.latencies.append(received - sent)
+        stats.step_latencies[name].append(received - sent)
+
+        reply = msg.get("text") or msg.get("caption") or ""
+        # Заявка уходит проектировщику до ответа клиенту, поэтому уже должна быть учтена
+        delivered = expected != CONFIRMED or user.chat_id in stats.designer_clients
+        stats.designer_clients.discard(user.chat_id)
+        if not reply.startswith(expected) or not delivered:
+            stats.step_mismatches[name] += 1
+            stats.journeys_failed[journey] += 1
+            return
+
+async def wait_http(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url) as resp:
+                    if resp.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Бот не поднял webhook-сервер на {url}")
+            await asyncio.sleep(0.2)
+
+def spawn_bot(args, api_url: str, workdir: str, log) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "BOT_TOKEN": "123456:LOADTEST",
+        "DESIGNER_CHAT_ID": str(DESIGNER_CHAT_ID),
+        "TELEGRAM_API_URL": api_url,
+        "USE_POLLING": "1" if args.mode == "polling" else "0",
+        "WEBHOOK_HOST": f"http://127.0.0.1:{args.bot_port}",
+        "WEBAPP_HOST": "127.0.0.1",
+        "WEBAPP_PORT": str(args.bot_port),
+        "FAST_JSON": "1" if args.fast_json else "0",
+        "LOG_LEVEL": args.bot_log_level,
+    })
+    # cwd — временный каталог, чтобы не трогать request_counter.txt репозитория
+    return subprocess.Popen([sys.executable, str(ROOT / "main.py")], env=env, cwd=workdir,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+async def run(args) -> dict:
+    fake = FakeTelegram(faults_from_args(args), webhook_connections=args.webhook_connections)
+    runner = web.AppRunner(fake.app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.api_port).start()
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    with tempfile.TemporaryDirectory(prefix="volthome-loadtest-") as workdir:
+        log = open(args.bot_log, "wb") if args.bot_log else subprocess.DEVNULL
+        proc = spawn_bot(args, api_url, workdir, log)
+        try:
+            ready = fake.webhook_set.wait() if args.mode == "webhook" else fake.polling_started.wait()
+            await asyncio.wait_for(ready, args.startup_timeout)
+            if args.mode == "webhook":
+                await wait_http(fake.webhook_url, args.startup_timeout)
+            print(f"bot ready ({args.mode}), starting {args.users} users…", flush=True)
+
+            stats = Stats()
+
+            def designer_sink(received: float, msg: dict) -> None:
+                found = DESIGNER_CLIENT_ID.search(msg.get("text") or "")
+                if found:
+                    stats.designer_clients.add(int(found.group(1)))
+
+            fake.watch(DESIGNER_CHAT_ID, sink=designer_sink)
+            sem = asyncio.Semaphore(args.concurrency)
+            rnd = random.Random(args.seed)
+            names = list(JOURNEYS)
+
+            async def one(i: int):
+                async with sem:
+                    await run_user(fake, SimUser(FIRST_CHAT_ID + i), rnd.choice(names), stats, args.step_timeout)
+
+            stats.started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.users)))
+            stats.finished = time.perf_counter()
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            if log is not subprocess.DEVNULL:
+                log.close()
+            await runner.cleanup()
+
+    report = build_report(args, stats, fake)
+    print_report(report, stats)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("webhook", "polling"), default="webhook")
+    parser.add_argument("--users", type=int, default=1000, help="сколько клиентов пройдут сценарий")
+    parser.add_argument("--concurrency", type=int, default=200, help="сколько клиентов активны одновременно")
+    parser.add_argument("--step-timeout", type=float, default=10.0, help="ожидание ответа бота на шаг, с")
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--bot-port", type=int, default=8000)
+    parser.add_argument("--webhook-connections", type=int, default=100)
+    parser.add_argument("--fast-json", action="store_true", help="запустить бота с FAST_JSON=1")
+    parser.add_argument("--bot-log", default="", help="куда писать stdout бота (по умолчанию — никуда)")
+    parser.add_argument("--bot-log-level", default="WARNING")
+    parser.add_argument("--json", default="", help="сохранить отчёт в JSON-файл")
+    add_fault_args(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
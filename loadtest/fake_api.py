@@ -0,0 +1,300 @@
+"""
+Локальный фейковый Telegram Bot API для нагрузочных тестов VoltHomeBot.
+
+Реализует методы, которыми пользуется бот: getMe, setWebhook, deleteWebhook,
+getWebhookInfo, getUpdates, sendMessage, sendPhoto, sendDocument,
+sendMediaGroup, answerCallbackQuery.
+
+Апдейты подаются через FakeTelegram.inject(): при установленном вебхуке они
+POST-ятся боту (как это делает Telegram), иначе ждут его в getUpdates.
+Ответы бота в чаты, на которые подписан драйвер (FakeTelegram.watch), идут
+в его очереди/обработчики; сообщения в прочие чаты только считаются.
+
+Задержка, доля 5xx и 429 настраиваются (FaultConfig).
+
+Отдельный запуск (бот: TELEGRAM_API_URL=http://127.0.0.1:8081):
+    python loadtest/fake_api.py --port 8081 --latency-ms 30 --error-rate 0.01
+"""
+
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from aiogram.utils import json
+
+BOT_USER = {
+    "id": 123456,
+    "is_bot": True,
+    "first_name": "VoltHome",
+    "username": "volthome_loadtest_bot",
+}
+
+# Методы, на которых по умолчанию имитируются сбои
+SEND_METHODS = ("sendMessage", "sendPhoto", "sendDocument", "sendMediaGroup", "answerCallbackQuery")
+
+# -------------------- CONFIG --------------------
+class FaultConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        fault_methods=SEND_METHODS,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.fault_methods = set(fault_methods)
+
+    async def delay(self) -> None:
+        ms = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if ms > 0:
+            await asyncio.sleep(ms / 1000.0)
+
+    def fault(self, method: str) -> Optional[web.Response]:
+        if method not in self.fault_methods:
+            return None
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return _error(429, f"Too Many Requests: retry after {self.retry_after}",
+                          parameters={"retry_after": self.retry_after})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return _error(500, "Internal Server Error: injected by fake_api")
+        return None
+
+def _ok(result) -> web.Response:
+    return web.json_response({"ok": True, "result": result}, dumps=json.dumps)
+
+def _error(code: int, description: str, parameters: Optional[dict] = None) -> web.Response:
+    body = {"ok": False, "error_code": code, "description": description}
+    if parameters:
+        body["parameters"] = parameters
+    return web.json_response(body, status=code, dumps=json.dumps)
+
+# -------------------- SERVER --------------------
+class FakeTelegram:
+    """Состояние фейкового Bot API + aiohttp-приложение поверх него."""
+
+    def __init__(self, faults: Optional[FaultConfig] = None, webhook_connections: int = 100):
+        self.faults = faults or FaultConfig()
+        self.webhook_connections = webhook_connections
+
+        self.webhook_url: Optional[str] = None
+        self.webhook_set = asyncio.Event()
+        self.polling_started = asyncio.Event()
+
+        self._updates: List[dict] = []
+        self._new_update = asyncio.Condition()
+        self._next_update_id = 1
+        self._next_message_id = 1
+
+        self._sinks: Dict[int, Callable[[float, dict], None]] = {}
+        self.unwatched_messages: Counter = Counter()
+        self.calls: Counter = Counter()
+        self.faults_injected: Counter = Counter()
+        self.webhook_failures = 0
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._delivery_tasks = set()
+
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self._handle)
+        self.app.on_cleanup.append(self._on_cleanup)
+
+    # ---- обработка вызовов API ----
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = dict(await request.post())
+
+        await self.faults.delay()
+        fault = self.faults.fault(method)
+        if fault is not None:
+            self.faults_injected[fault.status] += 1
+            return fault
+
+        handler = getattr(self, f"_m_{method}", None)
+        if handler is None:
+            return _error(404, f"Not Found: method {method} is not implemented in fake_api")
+        return await handler(params)
+
+    async def _m_getMe(self, params: dict) -> web.Response:
+        return _ok(BOT_USER)
+
+    async def _m_setWebhook(self, params: dict) -> web.Response:
+        self.webhook_url = params.get("url") or None
+        if self.webhook_url:
+            self.webhook_set.set()
+        return _ok(True)
+
+    async def _m_deleteWebhook(self, params: dict) -> web.Response:
+        self.webhook_url = None
+        self.webhook_set.clear()
+        if _param_bool(params.get("drop_pending_updates")):
+            self._updates.clear()
+        return _ok(True)
+
+    async def _m_getWebhookInfo(self, params: dict) -> web.Response:
+        return _ok({
+            "url": self.webhook_url or "",
+            "has_custom_certificate": False,
+            "pending_update_count": 0 if self.webhook_url else len(self._updates),
+        })
+
+    async def _m_getUpdates(self, params: dict) -> web.Response:
+        if self.webhook_url:
+            return _error(409, "Conflict: can't use getUpdates method while webhook is active")
+        self.polling_started.set()
+
+        offset = int(params.get("offset") or 0)
+        limit = min(int(params.get("limit") or 100), 100)
+        timeout = float(params.get("timeout") or 0)
+
+        # offset < 0 — «последние N апдейтов» (skip_updates)
+        if offset < 0:
+            return _ok(self._updates[offset:])
+
+        async with self._new_update:
+            # Подтверждённые апдейты (id < offset) больше не нужны
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            if not self._updates and timeout > 0:
+                try:
+                    await asyncio.wait_for(self._new_update.wait_for(lambda: self._updates), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return _ok(self._updates[:limit])
+
+    async def _m_sendMessage(self, params: dict) -> web.Response:
+        msg = self._message(params, text=params.get("text", ""))
+        return _ok(msg)
+
+    async def _m_sendPhoto(self, params: dict) -> web.Response:
+        return _ok(self._message(params, caption=params.get("caption"), photo=[{
+            "file_id": str(params.get("photo")), "file_unique_id": "fake", "width": 1280, "height": 960,
+        }]))
+
+    async def _m_sendDocument(self, params: dict) -> web.Response:
+        return _ok(self._message(params, caption=params.get("caption"), document={
+            "file_id": str(params.get("document")), "file_unique_id": "fake",
+        }))
+
+    async def _m_sendMediaGroup(self, params: dict) -> web.Response:
+        media = json.loads(params.get("media") or "[]")
+        return _ok([self._message(params, caption=item.get("caption")) for item in media])
+
+    async def _m_answerCallbackQuery(self, params: dict) -> web.Response:
+        return _ok(True)
+
+    def _message(self, params: dict, **content) -> dict:
+        chat_id = int(params["chat_id"])
+        msg = {
+            "message_id": self._next_message_id,
+            "from": BOT_USER,
+            "chat": {"id": chat_id, "type": "private"},
+            "date": int(time.time()),
+        }
+        msg.update({k: v for k, v in content.items() if v is not None})
+        if params.get("reply_markup"):
+            msg["reply_markup"] = json.loads(params["reply_markup"])
+        self._next_message_id += 1
+        sink = self._sinks.get(chat_id)
+        if sink is not None:
+            sink(time.perf_counter(), msg)
+        else:
+            self.unwatched_messages[chat_id] += 1
+        return msg
+
+    # ---- подписка на ответы бота ----
+    def watch(self, chat_id: int, sink: Optional[Callable[[float, dict], None]] = None) -> Optional[asyncio.Queue]:
+        """Подписывает драйвер на сообщения бота в чат.
+
+        Без sink возвращает очередь (время получения, сообщение); иначе вызывает sink.
+        """
+        if sink is not None:
+            self._sinks[chat_id] = sink
+            return None
+        inbox: asyncio.Queue = asyncio.Queue()
+        self._sinks[chat_id] = lambda received, msg: inbox.put_nowait((received, msg))
+        return inbox
+
+    def unwatch(self, chat_id: int) -> None:
+        self._sinks.pop(chat_id, None)
+
+    # ---- подача апдейтов ----
+    async def inject(self, update: dict) -> int:
+        """Отдаёт апдейт боту (вебхук или getUpdates). Возвращает update_id."""
+        update = dict(update, update_id=self._next_update_id)
+        self._next_update_id += 1
+
+        if self.webhook_url:
+            task = asyncio.ensure_future(self._deliver(update))
+            self._delivery_tasks.add(task)
+            task.add_done_callback(self._delivery_tasks.discard)
+        else:
+            async with self._new_update:
+                self._updates.append(update)
+                self._new_update.notify_all()
+        return update["update_id"]
+
+    async def _deliver(self, update: dict) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.webhook_connections),
+                json_serialize=json.dumps,
+            )
+        try:
+            async with self._session.post(self.webhook_url, json=update) as resp:
+                if resp.status != 200:
+                    self.webhook_failures += 1
+                await resp.read()
+        except aiohttp.ClientError as e:
+            self.webhook_failures += 1
+            logging.warning("Доставка вебхука не удалась: %s", e)
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        for task in list(self._delivery_tasks):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+
+def _param_bool(value) -> bool:
+    return str(value).lower() in ("1", "true")
+
+# -------------------- ENTRY --------------------
+def add_fault_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="задержка ответа API, мс")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="разброс задержки ±, мс")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 500 на send*-методах")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="доля ответов 429 на send*-методах")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after в ответах 429, с")
+
+def faults_from_args(args: argparse.Namespace) -> FaultConfig:
+    return FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    add_fault_args(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    fake = FakeTelegram(faults_from_args(args))
+    web.run_app(fake.app, host=args.host, port=args.port)
@@ -0,0 +1,211 @@
+"""
+VoltHomeBot — неблокирующее логирование.
+
+Записи из хендлеров кладутся в ограниченную очередь и пишутся в stdout
+отдельным потоком-слушателем в виде компактных JSON-строк.
+
+- Переполнение очереди не блокирует event loop: запись отбрасывается,
+  счётчик потерь растёт и попадает в поле "dropped" следующей записи.
+- Массовые INFO-события (extra={"sample": True}) прореживаются по LOG_SAMPLE_RATE.
+- В каждую запись добавляются update_id, chat_id, handler и latency_ms
+  текущего апдейта (см. UpdateLogMiddleware).
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from typing import Optional
+
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from update_info import update_chat_id
+
+# -------------------- ENV --------------------
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or str(default)).strip())
+    except ValueError:
+        return default
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float((os.getenv(name) or str(default)).strip())
+    except ValueError:
+        return default
+
+def _level_env(name: str, default: str) -> str:
+    level = (os.getenv(name) or default).strip().upper()
+    return level if isinstance(logging.getLevelName(level), int) else default
+
+LOG_LEVEL = _level_env("LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = max(_int_env("LOG_QUEUE_SIZE", 10000), 1)
+LOG_SAMPLE_RATE = min(max(_float_env("LOG_SAMPLE_RATE", 1.0), 0.0), 1.0)
+
+# Контекст текущего апдейта: {"update_id", "chat_id", "handler", "started"}
+_update_ctx: ContextVar[Optional[dict]] = ContextVar("volthome_update_ctx", default=None)
+
+# Логгер «access»-строк по каждому апдейту — самое массовое INFO-событие
+update_log = logging.getLogger("volthome.updates")
+
+# -------------------- CONTEXT --------------------
+class UpdateLogMiddleware(BaseMiddleware):
+    """Заполняет контекст апдейта и пишет строку с латентностью обработки."""
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        _update_ctx.set({
+            "update_id": update.update_id,
+            "chat_id": update_chat_id(update),
+            "handler": None,
+            "started": time.perf_counter(),
+        })
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        self._remember_handler()
+
+    async def on_process_callback_query(self, callback: types.CallbackQuery, data: dict):
+        self._remember_handler()
+
+    async def on_post_process_update(self, update: types.Update, results, data: dict):
+        update_log.info("update processed", extra={"sample": True})
+
+    @staticmethod
+    def _remember_handler():
+        ctx = _update_ctx.get()
+        handler = current_handler.get(None)
+        if ctx is not None and handler is not None:
+            ctx["handler"] = getattr(handler, "__name__", repr(handler))
+
+# -------------------- HANDLERS --------------------
+class _ContextFilter(logging.Filter):
+    """Прореживание массовых INFO и привязка записи к текущему апдейту.
+
+    Выполняется в потоке, который логирует, — только там виден контекст.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (
+            LOG_SAMPLE_RATE < 1.0
+            and record.levelno < logging.WARNING
+            and getattr(record, "sample", False)
+            and random.random() >= LOG_SAMPLE_RATE
+        ):
+            return False
+
+        ctx = _update_ctx.get()
+        if ctx is not None:
+            record.update_id = ctx["update_id"]
+            record.chat_id = ctx["chat_id"]
+            record.handler = ctx["handler"]
+            record.latency_ms = round((time.perf_counter() - ctx["started"]) * 1000, 2)
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, который никогда не ждёт: при полной очереди запись теряется."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped_total = 0
+        self._dropped_pending = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Форматируем сообщение и traceback здесь: args и exc_info могут
+        # измениться/протухнуть, пока запись ждёт в очереди.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Счётчик потерь ставим только на запись, которая реально попадёт в очередь
+        pending = self._dropped_pending
+        if pending:
+            record.dropped = pending
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_total += 1
+            self._dropped_pending += 1
+        else:
+            self._dropped_pending -= pending
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна компактная JSON-строка."""
+
+    _EXTRA_FIELDS = ("update_id", "chat_id", "handler", "latency_ms", "dropped")
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in self._EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                out[field] = value
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, separators=(",", ":"))
+
+_FORMATTER = JsonFormatter()
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # При остановке можно и подождать: очередь может быть заполнена до краёв
+        self.queue.put(self._sentinel)
+
+# -------------------- SETUP --------------------
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+def setup_logging() -> DroppingQueueHandler:
+    """Переключает root-логгер на очередь + фоновый поток записи в stdout."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    q: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = DroppingQueueHandler(q)
+    _queue_handler.addFilter(_ContextFilter())
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_FORMATTER)
+    _listener = _Listener(q, stream)
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(_queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener.start()
+    atexit.register(stop_logging)
+    return _queue_handler
+
+def stop_logging() -> None:
+    """Дописывает очередь и останавливает поток-слушатель."""
+    global _listener
+    if _listener is None:
+        return
+    if _queue_handler is not None and _queue_handler.dropped_total:
+        logging.getLogger(__name__).warning(
+            "Потеряно записей лога из-за переполнения очереди: %s", _queue_handler.dropped_total
+        )
+    _listener.stop()
+    _listener = None
+
+def dropped_count() -> int:
+    return _queue_handler.dropped_total if _queue_handler is not None else 0
@@ -17,12 +17,17 @@ import random
 import asyncio
 from typing import List, Tuple, Optional
 
-from aiogram import Bot, Dispatcher, types
+from aiogram import Dispatcher, types
+from aiogram.bot.api import TELEGRAM_PRODUCTION, TelegramAPIServer
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from dotenv import load_dotenv
 
+import codec
+from logsetup import UpdateLogMiddleware, setup_logging
+from outbox import OutboxBot, OutboxMiddleware
+
 # -------------------- ENV --------------------
 load_dotenv()
 
@@ -51,12 +56,25 @@ WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
 WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
 WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", "8000"))
 USE_POLLING = _bool_env("USE_POLLING", default=False)
+FAST_JSON = _bool_env("FAST_JSON", default=False)
 WEBHOOK_URL = f"{WEBHOOK_HOST}{WEBHOOK_PATH}" if WEBHOOK_HOST else None
 
+# Bot API: по умолчанию боевой Telegram; для нагрузочных тестов — локальный фейк (loadtest/)
+TELEGRAM_API_URL = (os.getenv("TELEGRAM_API_URL") or "").strip().rstrip("/")
+
 # -------------------- BOT / DP --------------------
+# Кодек ставим до создания Bot: aiohttp-сессия берёт json.dumps при создании
+JSON_MODE = codec.install(FAST_JSON)
 # ВАЖНО: НЕ задаём parse_mode глобально, чтобы не ломать сообщения в канал проектировщика!
-bot = Bot(token=BOT_TOKEN)  # parse_mode=None
+# OutboxBot склеивает подряд идущие ответы в чат текущего апдейта (см. outbox.py)
+bot = OutboxBot(
+    token=BOT_TOKEN,  # parse_mode=None
+    server=TelegramAPIServer.from_base(TELEGRAM_API_URL) if TELEGRAM_API_URL else TELEGRAM_PRODUCTION,
+)
 dp = Dispatcher(bot, storage=MemoryStorage())
+dp.middleware.setup(OutboxMiddleware())
+# update_id / chat_id / handler / латентность в каждой строке лога
+dp.middleware.setup(UpdateLogMiddleware())
 
 # Удобная константа для Markdown в сообщениях пользователю
 USER_MD = types.ParseMode.MARKDOWN
@@ -699,28 +717,37 @@ async def try_set_webhook() -> bool:
         logging.error("Не удалось поставить вебхук: %s", e)
         return False
 
+async def on_startup_webhook(_: Dispatcher):
+    # Executor делает await каждого колбэка — lambda с None здесь не подходит
+    init_request_counter()
+
 def start_as_webhook():
-    from aiogram.utils.executor import start_webhook
-    logging.info("Запускаю aiohttp-сервер webhook на %s:%s", WEBAPP_HOST, WEBAPP_PORT)
-    start_webhook(
-        dispatcher=dp,
+    from aiogram.utils.executor import Executor
+    logging.info("Запускаю aiohttp-сервер webhook на %s:%s (json=%s)", WEBAPP_HOST, WEBAPP_PORT, JSON_MODE)
+    executor = Executor(dp)
+    executor.on_startup(on_startup_webhook)
+    executor.start_webhook(
         webhook_path=WEBHOOK_PATH,
-        on_startup=lambda _: init_request_counter(),
-        on_shutdown=None,
+        request_handler=codec.WebhookHandler,
         host=WEBAPP_HOST,
         port=WEBAPP_PORT,
+        # Каждый апдейт уже логирует volthome.updates — access-лог aiohttp только дублирует его
+        access_log=None,
     )
 
 def start_as_polling():
     from aiogram.utils.executor import start_polling
-    logging.info("Запускаю long polling (skip_updates=True)")
+    logging.info("Запускаю long polling (skip_updates=True, json=%s)", JSON_MODE)
     init_request_counter()
     start_polling(dp, skip_updates=True)
 
 # -------------------- ENTRY --------------------
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    # Логи пишет фоновый поток из ограниченной очереди — event loop не ждёт stdout
+    setup_logging()
     logging.getLogger("aiogram").setLevel(logging.INFO)
+    if FAST_JSON and JSON_MODE != "orjson":
+        logging.warning("FAST_JSON включён, но orjson не установлен — использую stdlib json.")
 
     me = asyncio.get_event_loop().run_until_complete(bot.get_me())
     logging.info("Bot: %s", me.username)
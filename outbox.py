@@ -0,0 +1,112 @@
+"""
+VoltHomeBot — склейка исходящих сообщений в рамках одного апдейта.
+
+Пока обрабатывается апдейт, текстовые send_message в чат этого апдейта
+не уходят сразу, а копятся в буфере. В конце обработки (или перед любым
+другим вызовом Bot API) подряд идущие сообщения склеиваются в одно, если:
+- у них одинаковые parse_mode и прочие параметры отправки;
+- клавиатура (reply_markup) есть не больше чем у последнего из них;
+- итоговый текст укладывается в лимит Telegram.
+Иначе сообщения уходят по отдельности в исходном порядке.
+
+Буферизованный send_message возвращает None — хендлеры не должны
+полагаться на результат message.answer() в чат текущего апдейта.
+"""
+
+from contextvars import ContextVar
+from typing import List, Optional
+
+from aiogram import Bot, types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from update_info import update_chat_id
+
+MESSAGE_LIMIT = 4096
+JOIN_SEPARATOR = "\n\n"
+
+# Буфер текущего апдейта (None — буферизация выключена)
+_outbox: ContextVar[Optional["Outbox"]] = ContextVar("volthome_outbox", default=None)
+
+# -------------------- BUFFER --------------------
+class _Pending:
+    __slots__ = ("chat_id", "text", "params")
+
+    def __init__(self, chat_id, text: str, params: dict):
+        self.chat_id = chat_id
+        self.text = text
+        self.params = params
+
+    def can_absorb(self, other: "_Pending") -> bool:
+        """Можно ли дописать other в конец этого сообщения."""
+        if self.chat_id != other.chat_id:
+            return False
+        if self.params.get("reply_markup") is not None:
+            return False
+        mine = {k: v for k, v in self.params.items() if k != "reply_markup"}
+        theirs = {k: v for k, v in other.params.items() if k != "reply_markup"}
+        if mine != theirs or mine.get("entities") is not None:
+            return False
+        return len(self.text) + len(JOIN_SEPARATOR) + len(other.text) <= MESSAGE_LIMIT
+
+    def absorb(self, other: "_Pending") -> None:
+        self.text = f"{self.text}{JOIN_SEPARATOR}{other.text}"
+        self.params["reply_markup"] = other.params.get("reply_markup")
+
+def coalesce(items: List[_Pending]) -> List[_Pending]:
+    """Склеивает подряд идущие совместимые сообщения, сохраняя порядок."""
+    out: List[_Pending] = []
+    for item in items:
+        if out and out[-1].can_absorb(item):
+            out[-1].absorb(item)
+        else:
+            out.append(item)
+    return out
+
+class Outbox:
+    def __init__(self, chat_id: Optional[int]):
+        self.chat_id = chat_id
+        self._items: List[_Pending] = []
+
+    def accepts(self, chat_id) -> bool:
+        return self.chat_id is not None and chat_id == self.chat_id
+
+    def put(self, chat_id, text: str, params: dict) -> None:
+        self._items.append(_Pending(chat_id, text, params))
+
+    async def flush(self, bot: Bot) -> None:
+        # Забираем буфер целиком до отправки: send_message -> request -> flush не зациклится
+        items, self._items = self._items, []
+        for item in coalesce(items):
+            await Bot.send_message(bot, item.chat_id, item.text, **item.params)
+
+# -------------------- BOT --------------------
+class OutboxBot(Bot):
+    """Bot, который складывает send_message в чат текущего апдейта в буфер."""
+
+    async def send_message(self, chat_id, text, *args, **kwargs):
+        box = _outbox.get()
+        if box is None or args or not box.accepts(chat_id):
+            return await super().send_message(chat_id, text, *args, **kwargs)
+        box.put(chat_id, text, kwargs)
+        return None
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        # Любой другой вызов API — сначала отправляем накопленное, чтобы не нарушить порядок
+        box = _outbox.get()
+        if box is not None:
+            await box.flush(self)
+        return await super().request(method, data, files, **kwargs)
+
+# -------------------- MIDDLEWARE --------------------
+class OutboxMiddleware(BaseMiddleware):
+    """Открывает буфер на время обработки апдейта и отправляет его в конце."""
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        _outbox.set(Outbox(update_chat_id(update)))
+
+    async def on_post_process_update(self, update: types.Update, results, data: dict):
+        box = _outbox.get()
+        if box is None:
+            return
+        _outbox.set(None)
+        await box.flush(self.manager.bot)
@@ -0,0 +1,75 @@
+"""
+Тесты JSON-кодека (codec.py): подмена aiogram.utils.json и разбор
+webhook-тела в types.Update с сохранением сырых байтов.
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aiogram import types  # noqa: E402
+from aiogram.utils import json as aiogram_json  # noqa: E402
+
+import codec  # noqa: E402
+
+UPDATES_FILE = ROOT / "bench" / "updates.jsonl"
+
+@pytest.fixture(autouse=True)
+def stdlib_codec_after_test():
+    yield
+    codec.install(False)
+
+def _payloads():
+    return [line.encode() for line in UPDATES_FILE.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+def test_install_stdlib_patches_aiogram_json():
+    assert codec.install(False) == "json"
+    assert aiogram_json.loads is codec._std_loads
+    assert aiogram_json.dumps is codec._std_dumps
+    assert aiogram_json.dumps({"t": "Жилое"}) == '{"t": "Жилое"}'
+
+def test_install_fast_patches_aiogram_json():
+    pytest.importorskip("orjson")
+    assert codec.install(True) == "orjson"
+    assert aiogram_json.loads is codec._fast_loads
+    assert aiogram_json.dumps is codec._fast_dumps
+    # Как и stdlib с ensure_ascii=False: str без \u-экранирования
+    assert aiogram_json.dumps({"t": "Жилое"}) == '{"t":"Жилое"}'
+    assert aiogram_json.loads(b'{"t":"\xd0\x96"}') == {"t": "Ж"}
+
+@pytest.mark.parametrize("fast", [False, True], ids=["json", "orjson"])
+def test_webhook_parse_update_matches_stdlib_and_keeps_raw_bytes(fast):
+    if fast:
+        pytest.importorskip("orjson")
+    codec.install(fast)
+    seen = []
+
+    class Probe(codec.WebhookHandler):
+        async def post(self):
+            update = await self.parse_update(None)
+            seen.append((update, self.request["raw_update"]))
+            return web.Response(text="ok")
+
+    async def run(payloads):
+        app = web.Application()
+        app.router.add_route("POST", "/webhook", Probe)
+        async with TestClient(TestServer(app)) as client:
+            for raw in payloads:
+                resp = await client.post("/webhook", data=raw)
+                assert resp.status == 200
+
+    payloads = _payloads()
+    asyncio.run(run(payloads))
+
+    assert [raw for _, raw in seen] == payloads
+    for (update, _), raw in zip(seen, payloads):
+        expected = types.Update(**json.loads(raw))
+        assert update.to_python() == expected.to_python()
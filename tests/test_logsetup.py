@@ -0,0 +1,75 @@
+"""
+Тесты неблокирующего логирования (logsetup.py): счётчик потерь,
+прореживание INFO и контекст апдейта в записях.
+"""
+
+import sys
+import time
+import queue
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import logsetup  # noqa: E402
+
+@pytest.fixture
+def make_logger(request):
+    """Логгер с DroppingQueueHandler поверх очереди заданного размера, без слушателя."""
+    def make(maxsize: int):
+        handler = logsetup.DroppingQueueHandler(queue.Queue(maxsize=maxsize))
+        handler.addFilter(logsetup._ContextFilter())
+        logger = logging.getLogger(f"volthome.test.{request.node.name}")
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        return logger, handler
+    return make
+
+def test_drop_count_lands_on_next_queued_record(make_logger):
+    logger, handler = make_logger(1)
+    logger.info("fits")
+    logger.info("lost 1")
+    logger.info("lost 2")
+    assert handler.dropped_total == 2
+
+    assert handler.queue.get_nowait().msg == "fits"
+    logger.info("next")
+    record = handler.queue.get_nowait()
+    assert record.msg == "next"
+    assert record.dropped == 2
+
+    logger.info("after")
+    assert getattr(handler.queue.get_nowait(), "dropped", None) is None
+
+def test_sample_rate_zero_drops_sampled_info_but_keeps_warning(make_logger, monkeypatch):
+    monkeypatch.setattr(logsetup, "LOG_SAMPLE_RATE", 0.0)
+    logger, handler = make_logger(10)
+    logger.info("sampled", extra={"sample": True})
+    logger.info("regular")
+    logger.warning("sampled warning", extra={"sample": True})
+
+    got = [handler.queue.get_nowait().msg for _ in range(handler.queue.qsize())]
+    assert got == ["regular", "sampled warning"]
+
+def test_records_carry_update_context(make_logger):
+    logger, handler = make_logger(10)
+    token = logsetup._update_ctx.set({
+        "update_id": 7, "chat_id": 42, "handler": "cancel_request", "started": time.perf_counter(),
+    })
+    try:
+        logger.info("in update")
+    finally:
+        logsetup._update_ctx.reset(token)
+    logger.info("outside")
+
+    inside, outside = handler.queue.get_nowait(), handler.queue.get_nowait()
+    assert (inside.update_id, inside.chat_id, inside.handler) == (7, 42, "cancel_request")
+    assert inside.latency_ms >= 0
+    assert getattr(outside, "update_id", None) is None
+
+    line = logsetup.JsonFormatter().format(inside)
+    assert '"update_id":7' in line and '"handler":"cancel_request"' in line
@@ -0,0 +1,128 @@
+"""
+Golden-тест склейки исходящих сообщений (outbox.py).
+
+Записанные апдейты из bench/updates.jsonl прогоняются через main.dp с
+подменённым Bot.request; последовательность вызовов API сверяется с
+эталонной расшифровкой tests/golden/outbox_conversation.json.
+
+Перезаписать эталон после осознанного изменения диалога:
+    UPDATE_GOLDEN=1 python -m pytest tests/test_outbox_golden.py
+"""
+
+import os
+import sys
+import json
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("BOT_TOKEN", "123456:TEST")
+os.environ.setdefault("DESIGNER_CHAT_ID", "777")
+
+from aiogram import Bot, Dispatcher, types  # noqa: E402
+
+import main  # noqa: E402
+import outbox  # noqa: E402
+
+UPDATES_FILE = ROOT / "bench" / "updates.jsonl"
+GOLDEN_FILE = Path(__file__).parent / "golden" / "outbox_conversation.json"
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    """Подменяет Bot.request: вызовы записываются, ответы — правдоподобные заглушки."""
+    calls = []
+
+    async def fake_request(self, method, data=None, files=None, **kwargs):
+        data = data or {}
+        chat_id = data.get("chat_id")
+        calls.append([
+            method,
+            "designer" if chat_id == main.DESIGNER_CHAT_ID else chat_id,
+            data.get("text", data.get("caption")),
+            data.get("parse_mode"),
+            data.get("reply_markup") is not None,
+        ])
+        if method == "answerCallbackQuery":
+            return True
+        return {"message_id": len(calls), "date": 0, "chat": {"id": chat_id or 0, "type": "private"}}
+
+    monkeypatch.setattr(Bot, "request", fake_request)
+    return calls
+
+def _pending(text, chat_id=1, **params):
+    return outbox._Pending(chat_id, text, dict(params))
+
+# -------------------- GOLDEN --------------------
+def test_rendered_conversation_matches_golden(api_calls, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "REQUEST_COUNTER_FILE", str(tmp_path / "request_counter.txt"))
+    monkeypatch.setattr(main, "random", random.Random(0))
+    main.init_request_counter()
+
+    async def replay():
+        Bot.set_current(main.bot)
+        Dispatcher.set_current(main.dp)
+        transcript = []
+        for line in UPDATES_FILE.read_text(encoding="utf-8").splitlines():
+            update = json.loads(line)
+            api_calls.clear()
+            # Отдельная задача на апдейт — как в webhook/polling (контекст FSM не протекает)
+            await asyncio.ensure_future(main.dp.updates_handler.notify(types.Update(**update)))
+            transcript.append({"update_id": update["update_id"], "calls": list(api_calls)})
+        main.dp.storage.data.clear()  # FSM не должен протечь в другие тесты
+        return transcript
+
+    transcript = asyncio.run(replay())
+
+    if os.getenv("UPDATE_GOLDEN"):
+        GOLDEN_FILE.parent.mkdir(exist_ok=True)
+        GOLDEN_FILE.write_text(json.dumps(transcript, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    assert transcript == json.loads(GOLDEN_FILE.read_text(encoding="utf-8"))
+
+# -------------------- COALESCE --------------------
+def test_consecutive_plain_messages_are_merged():
+    out = outbox.coalesce([_pending("a", parse_mode="Markdown"), _pending("b", parse_mode="Markdown", reply_markup="kb")])
+    assert [(p.text, p.params["reply_markup"]) for p in out] == [("a\n\nb", "kb")]
+
+def test_markup_on_first_message_blocks_merge():
+    out = outbox.coalesce([_pending("a", reply_markup="kb"), _pending("b")])
+    assert [p.text for p in out] == ["a", "b"]
+
+def test_parse_mode_mismatch_blocks_merge():
+    out = outbox.coalesce([_pending("a", parse_mode="Markdown"), _pending("b", parse_mode=None)])
+    assert [p.text for p in out] == ["a", "b"]
+
+def test_different_chats_are_not_merged():
+    out = outbox.coalesce([_pending("a", chat_id=1), _pending("b", chat_id=2)])
+    assert [p.text for p in out] == ["a", "b"]
+
+def test_message_limit_blocks_merge():
+    half = outbox.MESSAGE_LIMIT // 2
+    fits = outbox.coalesce([_pending("a" * (half - 1)), _pending("b" * (half - 1))])
+    too_long = outbox.coalesce([_pending("a" * half), _pending("b" * half)])
+    assert len(fits) == 1 and len(fits[0].text) == outbox.MESSAGE_LIMIT
+    assert [len(p.text) for p in too_long] == [half, half]
+
+def test_buffer_is_flushed_before_other_api_calls(api_calls):
+    async def scenario():
+        token = outbox._outbox.set(outbox.Outbox(chat_id=42))
+        try:
+            await main.bot.send_message(42, "первое")
+            await main.bot.send_message(42, "второе")
+            await main.bot.send_photo(42, "file-id")
+            await main.bot.send_message(42, "третье")
+            assert [c[0] for c in api_calls] == ["sendMessage", "sendPhoto"]
+            await outbox._outbox.get().flush(main.bot)
+        finally:
+            outbox._outbox.reset(token)
+
+    asyncio.run(scenario())
+    assert [(c[0], c[2]) for c in api_calls] == [
+        ("sendMessage", "первое\n\nвторое"),
+        ("sendPhoto", None),
+        ("sendMessage", "третье"),
+    ]
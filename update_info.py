@@ -0,0 +1,15 @@
+"""
+VoltHomeBot — общие сведения об апдейте для middleware (логирование, outbox).
+"""
+
+from typing import Optional
+
+from aiogram import types
+
+def update_chat_id(update: types.Update) -> Optional[int]:
+    """Чат, к которому относится апдейт (сообщение или callback)."""
+    if update.message:
+        return update.message.chat.id
+    if update.callback_query and update.callback_query.message:
+        return update.callback_query.message.chat.id
+    return None